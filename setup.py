@@ -8,27 +8,143 @@ Usage:
 Run from the root of your Unity project.
 """
 
+import base64
 import json
 import os
-import platform
 import re
 import shutil
+import signal
 import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
 from pathlib import Path
+from urllib.parse import quote
 
 CI_SERVICE_ACCOUNT = "ci-distribution@hcgamesfirebase.iam.gserviceaccount.com"
+CI_SERVICE_ACCOUNT_ROLES = ("roles/firebaseappdistro.admin",)
+IAM_POLICY_ATTEMPTS = 5
+# gcloud output when set-iam-policy loses an etag race (HTTP 409 ABORTED)
+_IAM_CONFLICT_MARKERS = ("ABORTED", "concurrent policy changes")
+FIREBASE_API_URL = "https://firebase.googleapis.com/v1beta1/"
+PREREQS_STAMP_TTL = 6 * 3600  # seconds a successful prerequisites check is trusted
+
+_IS_DARWIN = sys.platform == "darwin"
+_RESTORE_SIGNALS = tuple(
+    getattr(signal, name) for name in ("SIGPIPE", "SIGXFSZ") if hasattr(signal, name)
+)
+
+_RE_NODE_VERSION = re.compile(r"v(\d+)")
+# Homebrew (Cellar/node/22.3.0, Cellar/node@20/20.11.1) and nvm
+# (versions/node/v20.11.1) install paths embed the Node version.
+_RE_NODE_PATH_VERSION = re.compile(
+    r"[\\/](?:Cellar[\\/]node(?:@\d+)?|versions[\\/]node)[\\/]v?(\d+\.\d+\.\d+)(?:_\d+)?[\\/]"
+)
+_RE_OVERRIDE_APP_ID = re.compile(rb"overrideDefaultApplicationIdentifier:\s*1")
+
+
+@cache
+def which(name):
+    """Cached shutil.which; see _clear_which_cache() for invalidation."""
+    return shutil.which(name)
+
+
+@cache
+def command_exists(name):
+    return which(name) is not None
+
+
+def _clear_which_cache():
+    """Forget cached executable lookups after PATH or installed tools change."""
+    which.cache_clear()
+    command_exists.cache_clear()
+
+
+def _spawn(argv):
+    """Run argv via posix_spawn (no fork page-table copy); return exit code.
+
+    Mirrors subprocess.run: signals Python ignores at startup get their
+    default disposition back in the child (restore_signals=True), and the
+    child is killed and reaped if waiting is interrupted.
+    """
+    spawn = os.posix_spawn if os.path.dirname(argv[0]) else os.posix_spawnp
+    pid = spawn(argv[0], argv, os.environ, setsigdef=_RESTORE_SIGNALS)
+    try:
+        _, status = os.waitpid(pid, 0)
+    except BaseException:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        raise
+    return os.waitstatus_to_exitcode(status)
 
 
 def run(cmd, capture=False, check=True):
-    """Run a shell command, optionally capturing output."""
+    """Run a command given as an argv list, optionally capturing output.
+
+    Commands are executed directly (no intermediate shell). The executable is
+    resolved through PATH first so npm-style .cmd shims work on Windows too.
+    Uncaptured commands use posix_spawn where available. Without capture,
+    returns True if the command exited successfully.
+    """
+    argv = [which(cmd[0]) or cmd[0]] + list(cmd[1:])
     if capture:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        try:
+            result = subprocess.run(argv, capture_output=True, text=True)
+        except OSError:
+            return None
         if check and result.returncode != 0:
             return None
         return result.stdout.strip()
     else:
-        subprocess.run(cmd, shell=True, check=check)
+        try:
+            if hasattr(os, "posix_spawn"):
+                returncode = _spawn(argv)
+            else:
+                returncode = subprocess.run(argv).returncode
+        except OSError:
+            if check:
+                raise
+            return False
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(returncode, argv)
+        return returncode == 0
+
+
+def _run_buffered(cmd, log, capture_stdout=False):
+    """Run a command from a worker thread without touching the terminal.
+
+    stdin is closed so nothing can prompt, and stdout/stderr are appended to
+    `log` so the caller can print them later without interleaving. With
+    capture_stdout, stdout is kept out of the log (e.g. JSON to be parsed)
+    and only stderr is logged. Returns (success, output).
+    """
+    argv = [which(cmd[0]) or cmd[0]] + list(cmd[1:])
+    try:
+        result = subprocess.run(
+            argv,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if capture_stdout else subprocess.STDOUT,
+            text=True,
+        )
+    except OSError as e:
+        log.append(f"Error: {e}")
+        return False, ""
+    if capture_stdout:
+        output = result.stdout.strip()
+        logged = result.stderr.rstrip()
+    else:
+        output = logged = result.stdout.rstrip()
+    if logged:
+        log.append(logged)
+    return result.returncode == 0, output
+
+
+def _print_log(log):
+    for line in log:
+        print(line)
 
 
 def _ensure_path():
@@ -36,68 +152,186 @@ def _ensure_path():
     priority = ["/opt/homebrew/opt/ruby/bin", "/opt/homebrew/bin", "/opt/homebrew/sbin"]
     extra = ["/usr/local/bin", os.path.expanduser("~/.npm-global/bin")]
     current = os.environ.get("PATH", "")
-    parts = current.split(os.pathsep)
-    # Remove priority dirs from current position, then prepend them
-    parts = [p for p in parts if p not in priority]
-    for p in extra:
-        if p not in parts:
-            parts.append(p)
-    os.environ["PATH"] = os.pathsep.join(priority + parts)
+    # Ordered dedup in one pass: priority dirs first (moved from wherever they
+    # were), then the existing entries, then any missing extras.
+    parts = dict.fromkeys(priority)
+    for p in current.split(os.pathsep) + extra:
+        if p:
+            parts.setdefault(p)
+    os.environ["PATH"] = os.pathsep.join(parts)
+    _clear_which_cache()
 
-_ensure_path()
 
+def _node_version(node):
+    """Return the version of the node binary at `node`, e.g. "v22.3.0".
+
+    Read from the resolved install path when it discloses the version, so the
+    common Homebrew/nvm case avoids starting a Node VM just to ask.
+    """
+    m = _RE_NODE_PATH_VERSION.search(os.path.realpath(node))
+    if m:
+        return f"v{m.group(1)}"
+    return run([node, "--version"], capture=True, check=False)
 
-def command_exists(name):
-    return shutil.which(name) is not None
+
+def _node_major(version_str):
+    """Parse the major version out of e.g. "v22.3.0"; None if unparseable."""
+    m = _RE_NODE_VERSION.match(version_str) if version_str else None
+    return int(m.group(1)) if m else None
 
 
 def check_node_version():
-    """Ensure Node.js >= 20 is available (required by Firebase CLI)."""
-    node = shutil.which("node")
+    """Ensure Node.js >= 20 is available (required by Firebase CLI).
+
+    Returns False if an installed Node.js could not be confirmed as >= 20
+    (after upgrading, if one was attempted) or its version is unreadable.
+    No node on PATH is not an error (e.g. the standalone firebase binary
+    bundles its own runtime), so that returns True.
+    """
+    node = which("node")
     if not node:
-        return
-    version_str = run("node --version", capture=True, check=False)
-    if not version_str:
-        return
-    m = re.match(r"v(\d+)", version_str)
-    if not m:
-        return
-    major = int(m.group(1))
+        return True
+    version_str = _node_version(node)
+    major = _node_major(version_str)
+    if major is None:
+        return False
     if major >= 20:
-        return
+        return True
     print(f"Node.js {version_str} is too old for Firebase CLI (need >= v20).")
     if command_exists("brew"):
         print("Upgrading Node.js via Homebrew...")
-        run("brew upgrade node || brew install node", check=False)
+        if not run(["brew", "upgrade", "node"], check=False):
+            run(["brew", "install", "node"], check=False)
         _ensure_path()
+        node = which("node")
+        major = _node_major(_node_version(node)) if node else None
+        if major is None or major < 20:
+            print("Warning: Node.js is still older than v20 after upgrading.")
+            return False
+        return True
     else:
         print("Error: Please upgrade Node.js to >= v20.")
         sys.exit(1)
 
 
+def _config_home():
+    return Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config")
+
+
+def _prereqs_stamp_path():
+    return _config_home() / "hcg-devops" / "prereqs.json"
+
+
+def _prereqs_recently_checked():
+    """True if a previous run passed the prerequisites within the TTL.
+
+    Delete the stamp file to force a full check.
+    """
+    try:
+        with _prereqs_stamp_path().open("r", encoding="utf-8") as f:
+            ts = json.load(f)["ts"]
+        age = time.time() - ts
+        return 0 <= age < PREREQS_STAMP_TTL and command_exists("firebase")
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+
+def _record_prereqs_ok():
+    stamp = _prereqs_stamp_path()
+    try:
+        stamp.parent.mkdir(parents=True, exist_ok=True)
+        with stamp.open("w", encoding="utf-8") as f:
+            json.dump({"ts": time.time()}, f)
+    except OSError:
+        pass
+
+
+def _has_firebase_login():
+    """Check for Firebase CLI credentials without starting the CLI.
+
+    The CLI keeps its login in configstore's firebase-tools.json; a stored
+    refresh token means the user has logged in before.
+    """
+    if os.environ.get("FIREBASE_TOKEN"):
+        return True
+    cred_path = _config_home() / "configstore" / "firebase-tools.json"
+    try:
+        with cred_path.open("r", encoding="utf-8") as f:
+            store = json.load(f)
+    except (OSError, ValueError):
+        return False
+    tokens = store.get("tokens") if isinstance(store, dict) else None
+    return isinstance(tokens, dict) and bool(tokens.get("refresh_token"))
+
+
 def check_prerequisites():
-    """Ensure Firebase CLI is installed and user is logged in."""
-    check_node_version()
+    """Ensure Firebase CLI is installed and user is logged in.
+
+    Skipped if a previous run succeeded recently (see PREREQS_STAMP_TTL).
+    """
+    if _prereqs_recently_checked():
+        return
+
+    node_ok = check_node_version()
 
     # Firebase CLI
     if not command_exists("firebase"):
         if command_exists("npm"):
             print("Installing Firebase CLI via npm...")
-            run("npm install -g firebase-tools")
-        elif platform.system() == "Darwin" and command_exists("brew"):
+            run(["npm", "install", "-g", "firebase-tools"])
+        elif _IS_DARWIN and command_exists("brew"):
             print("Installing Firebase CLI via Homebrew...")
-            run("brew install firebase-cli")
+            run(["brew", "install", "firebase-cli"])
         else:
             print("Error: Install Firebase CLI manually:")
             print("  npm install -g firebase-tools")
             print("  https://firebase.google.com/docs/cli")
             sys.exit(1)
+        _clear_which_cache()
+
+    # Firebase login check (only probe the CLI if no stored login is found)
+    if not _has_firebase_login():
+        result = run(["firebase", "projects:list"], capture=True, check=False)
+        if result is None:
+            print("You need to log in to Firebase.")
+            run(["firebase", "login"], check=False)
+            # Login outcome is unknown; verify again on the next run.
+            return
+
+    if node_ok:
+        _record_prereqs_ok()
+
+
+def _parse_application_identifiers(lines):
+    """Return the per-platform entries of the applicationIdentifier block.
+
+    Single pass over the lines: find the block header, then collect its
+    indented "Platform: id" lines, stopping at the next key at the header's
+    own indentation. This prevents matching fields from other blocks like
+    buildNumber. Stops early once both iPhone and Android are known, so the
+    rest of the file is never read.
 
-    # Firebase login check
-    result = run("firebase projects:list", capture=True, check=False)
-    if result is None:
-        print("You need to log in to Firebase.")
-        run("firebase login", check=False)
+    Works on raw bytes lines; only the matched IDs are decoded.
+    """
+    ids = {}
+    header_indent = None
+    for line in lines:
+        line = line.rstrip()
+        stripped = line.lstrip()
+        indent = len(line) - len(stripped)
+        if header_indent is None:
+            if stripped == b"applicationIdentifier:":
+                header_indent = indent
+            continue
+        if not stripped or indent <= header_indent:
+            break
+        key, sep, value = stripped.partition(b":")
+        value = value.strip()
+        if sep and value:
+            ids[key.decode("utf-8")] = value.decode("utf-8")
+            if "iPhone" in ids and "Android" in ids:
+                break
+    return ids
 
 
 def read_bundle_ids(game_name):
@@ -112,41 +346,24 @@ def read_bundle_ids(game_name):
         print(f"Error: {settings_path} not found. Run this from a Unity project root.")
         sys.exit(1)
 
-    content = settings_path.read_text(encoding="utf-8")
-
-    # Extract the applicationIdentifier block (indented lines after the key,
-    # stopping at the next top-level key). This prevents matching fields from
-    # other blocks like buildNumber.
-    block_m = re.search(r"applicationIdentifier:\n((?:[ \t]+.+\n)*)", content)
-    block = block_m.group(1) if block_m else ""
-
-    ios_id = None
-    android_id = None
-    default_id = None
-
-    m = re.search(r"iPhone:\s*([\w.\-]+)", block)
-    if m:
-        ios_id = m.group(1).strip()
-
-    m = re.search(r"Android:\s*([\w.\-]+)", block)
-    if m:
-        android_id = m.group(1).strip()
-
-    m = re.search(r"Standalone:\s*([\w.\-]+)", block)
-    if m:
-        default_id = m.group(1).strip()
+    with settings_path.open("rb") as f:
+        ids = _parse_application_identifiers(f)
+    ios_id = ids.get("iPhone")
+    android_id = ids.get("Android")
+    default_id = ids.get("Standalone")
 
     # If per-platform IDs are missing, disable override so Unity uses the
     # default applicationIdentifier for all platforms.
     if not ios_id or not android_id:
-        override_m = re.search(r"overrideDefaultApplicationIdentifier:\s*1", content)
+        content = settings_path.read_bytes()
+        override_m = _RE_OVERRIDE_APP_ID.search(content)
         if override_m:
             print("Disabling overrideDefaultApplicationIdentifier (per-platform IDs not set)...")
             content = content.replace(
-                "overrideDefaultApplicationIdentifier: 1",
-                "overrideDefaultApplicationIdentifier: 0",
+                b"overrideDefaultApplicationIdentifier: 1",
+                b"overrideDefaultApplicationIdentifier: 0",
             )
-            settings_path.write_text(content, encoding="utf-8")
+            settings_path.write_bytes(content)
 
         # Fall back to default bundle ID
         fallback = default_id or f"com.homecookedgames.{game_name.lower().replace(' ', '')}"
@@ -156,67 +373,273 @@ def read_bundle_ids(game_name):
     return ios_id, android_id
 
 
-def setup_firebase(game_name, project_id, ios_bundle_id, android_bundle_id):
-    """Create Firebase project, register apps, download config files."""
-    print(f"\nCreating Firebase project: {project_id}...")
-    run(f'firebase projects:create "{project_id}" --display-name "{game_name}"', check=False)
-
-    # Register iOS app
-    if ios_bundle_id:
-        print(f"Registering iOS app ({ios_bundle_id})...")
-        run(
-            f'firebase apps:create ios --bundle-id "{ios_bundle_id}" --project "{project_id}"',
-            check=False,
+def _gcloud_access_token():
+    """Return a gcloud access token for the Firebase REST API, or None."""
+    if not command_exists("gcloud"):
+        return None
+    return run(["gcloud", "auth", "print-access-token"], capture=True) or None
+
+
+def _firebase_api_get(path, token):
+    """GET a Firebase Management API resource and return the parsed JSON."""
+    import urllib.request  # heavy (http.client, ssl); only needed here
+
+    request = urllib.request.Request(
+        FIREBASE_API_URL + path,
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.load(response)
+
+
+def _download_app_config(project_id, collection, key_field, key, out_path, token):
+    """Download an app's config file in-process via the REST API.
+
+    Looks the app up in projects/<id>/<collection> by key_field (bundleId or
+    packageName). Returns False if the download could not be done this way,
+    so the caller can fall back to the Firebase CLI.
+    """
+    if not token or not key:
+        return False
+    import http.client  # for HTTPException; loaded by urllib.request anyway
+
+    project_path = f"projects/{quote(project_id, safe='')}/{collection}"
+    try:
+        apps = _firebase_api_get(project_path, token).get("apps", [])
+        app = next((a for a in apps if a.get(key_field) == key), None)
+        if app is None:
+            return False
+        config = _firebase_api_get(f"{project_path}/{app['appId']}/config", token)
+        out_path.write_bytes(base64.b64decode(config["configFileContents"]))
+    except (OSError, ValueError, KeyError, http.client.HTTPException):
+        return False
+    return True
+
+
+def _setup_ios_app(game_name, project_id, bundle_id, settings_dir, token):
+    """Register the iOS app, then download its GoogleService-Info.plist.
+
+    Runs on a worker thread: returns its log lines instead of printing.
+    """
+    log = []
+    if bundle_id:
+        log.append(f"Registering iOS app ({bundle_id})...")
+        _run_buffered(
+            [
+                "firebase", "apps:create", "ios", game_name,
+                "--bundle-id", bundle_id, "--app-store-id", "",
+                "--project", project_id, "--non-interactive",
+            ],
+            log,
         )
 
-    # Register Android app
-    if android_bundle_id:
-        print(f"Registering Android app ({android_bundle_id})...")
-        run(
-            f'firebase apps:create android --package-name "{android_bundle_id}" --project "{project_id}"',
-            check=False,
+    log.append("Downloading GoogleService-Info.plist...")
+    out_path = settings_dir / "GoogleService-Info.plist"
+    if not _download_app_config(project_id, "iosApps", "bundleId", bundle_id, out_path, token):
+        _run_buffered(
+            [
+                "firebase", "apps:sdkconfig", "ios", "--project", project_id,
+                "--out", str(out_path), "--non-interactive",
+            ],
+            log,
         )
+    return log
 
-    # Download config files
-    settings_dir = Path("Assets") / "Settings"
-    settings_dir.mkdir(parents=True, exist_ok=True)
 
-    print("Downloading GoogleService-Info.plist...")
-    run(
-        f'firebase apps:sdkconfig ios --project "{project_id}" '
-        f'--out "{settings_dir / "GoogleService-Info.plist"}"',
-        check=False,
-    )
+def _setup_android_app(game_name, project_id, package_name, settings_dir, token):
+    """Register the Android app, then download its google-services.json.
 
-    print("Downloading google-services.json...")
-    run(
-        f'firebase apps:sdkconfig android --project "{project_id}" '
-        f'--out "{settings_dir / "google-services.json"}"',
-        check=False,
-    )
+    Runs on a worker thread: returns its log lines instead of printing.
+    """
+    log = []
+    if package_name:
+        log.append(f"Registering Android app ({package_name})...")
+        _run_buffered(
+            [
+                "firebase", "apps:create", "android", game_name,
+                "--package-name", package_name,
+                "--project", project_id, "--non-interactive",
+            ],
+            log,
+        )
 
-    # Add CI service account
-    print("Adding CI service account to Firebase project...")
-    if command_exists("gcloud"):
-        run(
-            f"gcloud projects add-iam-policy-binding {project_id} "
-            f'--member="serviceAccount:{CI_SERVICE_ACCOUNT}" '
-            f'--role="roles/firebaseappdistro.admin" --quiet',
-            check=False,
+    log.append("Downloading google-services.json...")
+    out_path = settings_dir / "google-services.json"
+    if not _download_app_config(
+        project_id, "androidApps", "packageName", package_name, out_path, token
+    ):
+        _run_buffered(
+            [
+                "firebase", "apps:sdkconfig", "android", "--project", project_id,
+                "--out", str(out_path), "--non-interactive",
+            ],
+            log,
         )
-    else:
-        print(
+    return log
+
+
+def _grant_roles(policy, member, roles):
+    """Add member to each role's unconditional binding in an IAM policy.
+
+    Mutates policy in place; returns True if anything changed.
+    """
+    bindings = policy.setdefault("bindings", [])
+    by_role = {b["role"]: b for b in bindings if "condition" not in b}
+    changed = False
+    for role in roles:
+        binding = by_role.get(role)
+        if binding is None:
+            bindings.append({"role": role, "members": [member]})
+            changed = True
+        elif member not in binding.setdefault("members", []):
+            binding["members"].append(member)
+            changed = True
+    return changed
+
+
+def _get_iam_policy(project_id, log):
+    """Fetch a project's IAM policy as a dict, or None if it can't be read."""
+    ok, output = _run_buffered(
+        ["gcloud", "projects", "get-iam-policy", project_id, "--format=json", "--quiet"],
+        log,
+        capture_stdout=True,
+    )
+    try:
+        policy = json.loads(output) if ok and output else None
+    except ValueError:
+        return None
+    return policy if isinstance(policy, dict) else None
+
+
+def _set_iam_policy(project_id, policy, log):
+    """Write an IAM policy (etag included) back; returns (success, output)."""
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".json", encoding="utf-8", delete=False
+    ) as f:
+        json.dump(policy, f)
+    try:
+        return _run_buffered(
+            ["gcloud", "projects", "set-iam-policy", project_id, f.name, "--quiet"],
+            log,
+        )
+    finally:
+        os.unlink(f.name)
+
+
+def _add_ci_service_account(project_id):
+    """Grant the CI service account its roles on the project.
+
+    Reads the IAM policy once, merges every role locally and writes it back
+    once, instead of one read-modify-write round-trip per role. If the write
+    is rejected because the policy changed meanwhile (etag conflict, e.g.
+    from Firebase provisioning a new project), the whole read-modify-write is
+    retried. Runs on a worker thread: returns its log lines instead of printing.
+    """
+    log = ["Adding CI service account to Firebase project..."]
+    if not command_exists("gcloud"):
+        log.append(
             f"Warning: gcloud not found. Add {CI_SERVICE_ACCOUNT} manually "
             f"in Firebase Console with App Distribution Admin role."
         )
+        return log
+
+    member = f"serviceAccount:{CI_SERVICE_ACCOUNT}"
+    for attempt in range(IAM_POLICY_ATTEMPTS):
+        policy = _get_iam_policy(project_id, log)
+        if policy is None:
+            log.append(f"Warning: Could not read IAM policy for {project_id}.")
+            return log
+        if not _grant_roles(policy, member, CI_SERVICE_ACCOUNT_ROLES):
+            log.append("CI service account already has the required roles.")
+            return log
+
+        attempt_log = []
+        ok, output = _set_iam_policy(project_id, policy, attempt_log)
+        if ok or not any(marker in output for marker in _IAM_CONFLICT_MARKERS):
+            log.extend(attempt_log)
+            return log
+        if attempt < IAM_POLICY_ATTEMPTS - 1:
+            log.append("IAM policy changed concurrently; retrying...")
+            time.sleep(2 ** attempt)
+
+    log.extend(attempt_log)
+    log.append(f"Warning: Gave up updating IAM policy for {project_id} after repeated conflicts.")
+    return log
 
 
-def write_file(path, content):
-    """Write a file, creating parent directories as needed."""
+def setup_firebase(game_name, project_id, ios_bundle_id, android_bundle_id):
+    """Create Firebase project, register apps, download config files.
+
+    Only project creation has to happen first; the per-platform app setup and
+    the IAM binding are independent of each other and run concurrently.
+    Workers never touch the terminal (commands run non-interactively with
+    buffered output); each worker's log is printed, in order, once it is done.
+    Config files are fetched from the REST API when a gcloud token is
+    available, falling back to `firebase apps:sdkconfig` otherwise.
+    """
+    print(f"\nCreating Firebase project: {project_id}...")
+    run(
+        ["firebase", "projects:create", project_id, "--display-name", game_name],
+        check=False,
+    )
+
+    settings_dir = Path("Assets") / "Settings"
+    settings_dir.mkdir(parents=True, exist_ok=True)
+    token = _gcloud_access_token()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(
+                _setup_ios_app, game_name, project_id, ios_bundle_id, settings_dir, token
+            ),
+            executor.submit(
+                _setup_android_app, game_name, project_id, android_bundle_id, settings_dir, token
+            ),
+            executor.submit(_add_ci_service_account, project_id),
+        ]
+        for future in futures:
+            _print_log(future.result())
+
+
+def _write_file(path, content):
+    """Write a file whose parent directory already exists. Thread-safe.
+
+    Skips the write if the file already holds exactly this content, so
+    re-runs leave mtimes (and any caches keyed on them) alone. Returns the
+    path and whether it was written.
+    """
     path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
+    data = content.replace("\n", os.linesep).encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return path, False
+    except OSError:
+        pass
     path.write_text(content, encoding="utf-8")
-    print(f"  Created {path}")
+    return path, True
+
+
+def _report_write(path, written):
+    print(f"  {'Created' if written else 'Unchanged'} {path}")
+
+
+def write_file(path, content):
+    """Write a file, creating parent directories as needed, and report it."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    _report_write(*_write_file(path, content))
+
+
+def write_files(files):
+    """Write (path, content) pairs concurrently, reporting them in order.
+
+    Parent directories are created once up front, so the workers only write.
+    """
+    for parent in dict.fromkeys(Path(path).parent for path, _ in files):
+        parent.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=len(files)) as executor:
+        results = list(executor.map(lambda pc: _write_file(*pc), files))
+    for path, written in results:
+        _report_write(path, written)
 
 
 def generate_boilerplate(game_name):
@@ -287,7 +710,6 @@ jobs:
       clean_build: ${{{{ inputs.cleanBuild }}}}
     secrets: inherit
 """
-    write_file(".github/workflows/build.yml", build_yml)
 
     # fastlane/Fastfile
     fastfile = """import_from_git(
@@ -296,14 +718,12 @@ jobs:
   path: "fastlane/Fastfile"
 )
 """
-    write_file("fastlane/Fastfile", fastfile)
 
     # fastlane/Matchfile
     matchfile = """git_url("https://github.com/oguztecimer/ios-certificates.git")
 storage_mode("git")
 type("appstore")
 """
-    write_file("fastlane/Matchfile", matchfile)
 
     # Gemfile
     gemfile = """source "https://rubygems.org"
@@ -312,7 +732,6 @@ gem "fastlane"
 gem "cocoapods"
 gem "fastlane-plugin-firebase_app_distribution"
 """
-    write_file("Gemfile", gemfile)
 
     # .gitignore
     gitignore = """# =========================
@@ -392,11 +811,29 @@ fastlane/api_key.json
 fastlane/AuthKey*.p8
 fastlane/report.xml
 """
-    write_file(".gitignore", gitignore)
 
+    write_files([
+        (".github/workflows/build.yml", build_yml),
+        ("fastlane/Fastfile", fastfile),
+        ("fastlane/Matchfile", matchfile),
+        ("Gemfile", gemfile),
+        (".gitignore", gitignore),
+    ])
+
+
+def _bundle_lock():
+    log = []
+    _run_buffered(["bundle", "lock"], log)
+    return log
+
+
+def generate_gemfile_lock(executor):
+    """Copy Gemfile.lock template, or generate via bundler as fallback.
 
-def generate_gemfile_lock():
-    """Copy Gemfile.lock template, or generate via bundler as fallback."""
+    The template copy happens immediately. The (slow) bundler fallback is
+    submitted to executor with its output buffered; the returned future
+    yields its log lines. Returns None when nothing runs in the background.
+    """
     # Try to copy template from devops-toolkit package
     script_dir = Path(__file__).resolve().parent
     template = script_dir / "UnityPackage" / "Editor" / "Templates~" / "Gemfile.lock"
@@ -404,12 +841,36 @@ def generate_gemfile_lock():
         print("Copying Gemfile.lock template...")
         write_file("Gemfile.lock", template.read_text())
     elif command_exists("bundle"):
-        print("Generating Gemfile.lock via bundler...")
-        run("bundle lock", check=False)
+        print("Generating Gemfile.lock via bundler (in the background)...")
+        return executor.submit(_bundle_lock)
     else:
         print("Warning: bundler not found and no template available. Run 'bundle lock' manually.")
 
 
+# Final report; CI_SERVICE_ACCOUNT is constant, so format it once at import.
+SUMMARY = f"""
+Done! Files created:
+  .gitignore
+  .github/workflows/build.yml
+  fastlane/Fastfile
+  fastlane/Matchfile
+  Gemfile
+  Assets/Settings/GoogleService-Info.plist  (if Firebase succeeded)
+  Assets/Settings/google-services.json      (if Firebase succeeded)
+
+Remaining manual steps:
+  1. Ensure these GitHub secrets are set (org-level or repo-level):
+     - UNITY_LICENSE
+     - MATCH_PASSWORD, MATCH_KEYCHAIN_PASSWORD, MATCH_GIT_BASIC_AUTHORIZATION
+     - APP_STORE_CONNECT_API_KEY_KEY_ID, APP_STORE_CONNECT_API_KEY_ISSUER_ID, APP_STORE_CONNECT_API_KEY_KEY
+     - ANDROID_KEYSTORE_NAME, ANDROID_KEYSTORE_BASE64, ANDROID_KEYSTORE_PASS, ANDROID_KEYALIAS_NAME, ANDROID_KEYALIAS_PASS
+     - FIREBASE_SERVICE_ACCOUNT_JSON
+  2. If Firebase config download failed, download manually from Firebase Console.
+  3. If service account wasn't added, add {CI_SERVICE_ACCOUNT}
+     with "Firebase App Distribution Admin" role in Google Cloud Console IAM.
+"""
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python setup.py <GameName>")
@@ -422,6 +883,7 @@ def main():
     print(f"Setting up CI/CD for {game_name}...\n")
 
     # Prerequisites
+    _ensure_path()
     check_prerequisites()
 
     # Read bundle IDs
@@ -429,38 +891,23 @@ def main():
     print(f"iOS bundle ID: {ios_bundle_id}")
     print(f"Android bundle ID: {android_bundle_id}")
 
-    # Firebase setup
-    setup_firebase(game_name, project_id, ios_bundle_id, android_bundle_id)
-
     # Generate boilerplate
     print("\nGenerating CI/CD files...")
     generate_boilerplate(game_name)
 
-    # Gemfile.lock
-    generate_gemfile_lock()
+    # Gemfile.lock only needs the Gemfile; if it has to be resolved by
+    # bundler, that runs in the background during the Firebase setup.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        gemfile_lock = generate_gemfile_lock(executor)
 
-    # Summary
-    print(f"""
-Done! Files created:
-  .gitignore
-  .github/workflows/build.yml
-  fastlane/Fastfile
-  fastlane/Matchfile
-  Gemfile
-  Assets/Settings/GoogleService-Info.plist  (if Firebase succeeded)
-  Assets/Settings/google-services.json      (if Firebase succeeded)
+        # Firebase setup
+        setup_firebase(game_name, project_id, ios_bundle_id, android_bundle_id)
 
-Remaining manual steps:
-  1. Ensure these GitHub secrets are set (org-level or repo-level):
-     - UNITY_LICENSE
-     - MATCH_PASSWORD, MATCH_KEYCHAIN_PASSWORD, MATCH_GIT_BASIC_AUTHORIZATION
-     - APP_STORE_CONNECT_API_KEY_KEY_ID, APP_STORE_CONNECT_API_KEY_ISSUER_ID, APP_STORE_CONNECT_API_KEY_KEY
-     - ANDROID_KEYSTORE_NAME, ANDROID_KEYSTORE_BASE64, ANDROID_KEYSTORE_PASS, ANDROID_KEYALIAS_NAME, ANDROID_KEYALIAS_PASS
-     - FIREBASE_SERVICE_ACCOUNT_JSON
-  2. If Firebase config download failed, download manually from Firebase Console.
-  3. If service account wasn't added, add {CI_SERVICE_ACCOUNT}
-     with "Firebase App Distribution Admin" role in Google Cloud Console IAM.
-""")
+        if gemfile_lock is not None:
+            _print_log(gemfile_lock.result())
+
+    # Summary
+    print(SUMMARY)
 
 
 if __name__ == "__main__":